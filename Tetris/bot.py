@@ -0,0 +1,210 @@
+"""
+Bot de Tetris por búsqueda de colocaciones
+Para cada pieza prueba todas las rotaciones y columnas alcanzables, evalúa el
+tablero resultante y juega la mejor. Permite lanzar muchas partidas en paralelo
+para ajustar los pesos de la evaluación y medir el rendimiento.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core import MIN_MATCH, TetrisGame
+
+# Pesos de la evaluación: altura total, altura máxima, irregularidad y grupos eliminados
+DEFAULT_WEIGHTS = (-0.51, -0.3, -0.18, 0.76)
+
+# Penalización de una colocación que termina la partida
+GAME_OVER_PENALTY = -1e9
+
+
+def enumerate_placements(game):
+    """Colocaciones (rotación, x, y) alcanzables por la pieza actual
+
+    La pieza aparece en la fila 0: se rota allí, se desplaza por esa fila
+    y luego cae, igual que en el juego. Las rotaciones con la misma forma
+    (la O, o la S/Z/I tras dos giros) se prueban una sola vez.
+    """
+    board = game.board
+    rotations = game.rotations[game.current_piece["kind"]]
+    start_rotation = game.current_piece["rotation"]
+    start_x, start_y = game.current_x, game.current_y
+
+    placements = []
+    seen = set()
+    for turns in range(4):
+        index = (start_rotation + turns) % 4
+        rotation = rotations[index]
+        # Cada giro intermedio tiene que caber en la posición inicial
+        if not board.fits(rotation, start_x, start_y):
+            break
+        if rotation.bits in seen:
+            continue
+        seen.add(rotation.bits)
+
+        for step in (-1, 1):
+            x = start_x if step < 0 else start_x + 1
+            while board.fits(rotation, x, start_y):
+                y = start_y
+                while board.fits(rotation, x, y + 1):
+                    y += 1
+                placements.append((turns, x, y))
+                x += step
+    return placements
+
+
+def column_heights(board):
+    """Bloques por columna; como la gravedad compacta el tablero, es su altura"""
+    return (board.colors != 0).sum(axis=0)
+
+
+def board_features(heights):
+    """Altura total, altura máxima e irregularidad del tablero"""
+    heights = [int(h) for h in heights]
+    bumpiness = sum(abs(a - b) for a, b in zip(heights, heights[1:]))
+    return sum(heights), max(heights), bumpiness
+
+
+def settled_cells(heights, rotation, x, board_height):
+    """Celdas de la pieza tras caer sobre un tablero compacto de esas alturas"""
+    counts = [0] * rotation.width
+    for _, j in rotation.cells:
+        counts[j] += 1
+    return [
+        (board_height - heights[x + j] - k - 1, x + j)
+        for j, count in enumerate(counts)
+        for k in range(count)
+    ]
+
+
+def color_lines(board):
+    """Filas y columnas de colores como listas de Python, para contar rápido"""
+    rows = board.colors.tolist()
+    return rows, [list(column) for column in zip(*rows)]
+
+
+def forms_group(lines, cells, color):
+    """True si poner `color` en las celdas vacías (y, x) completa un grupo
+
+    El tablero ya es estable (clear_matches limpia hasta que no cambia),
+    así que un grupo nuevo sólo puede estar en las filas y columnas de esas
+    celdas.
+    """
+    rows, columns = lines
+    new_in_row = {}
+    new_in_column = {}
+    for y, x in cells:
+        new_in_row[y] = new_in_row.get(y, 0) + 1
+        new_in_column[x] = new_in_column.get(x, 0) + 1
+    for y, count in new_in_row.items():
+        if rows[y].count(color) + count >= MIN_MATCH:
+            return True
+    for x, count in new_in_column.items():
+        if columns[x].count(color) + count >= MIN_MATCH:
+            return True
+    return False
+
+
+def evaluate(game, turns, x, y, heights=None, lines=None, weights=DEFAULT_WEIGHTS):
+    """Puntuación del tablero tras colocar la pieza actual en (turns, x, y)
+
+    `heights` y `lines` se pueden pasar ya calculados para no repetirlos en
+    cada colocación de la misma pieza.
+    """
+    # En la fila superior la pieza termina la partida (ver TetrisGame.place_piece)
+    if y == 0:
+        return GAME_OVER_PENALTY
+    if heights is None:
+        heights = column_heights(game.board)
+    if lines is None:
+        lines = color_lines(game.board)
+    piece = game.current_piece
+    rotation = game.rotations[piece["kind"]][(piece["rotation"] + turns) % 4]
+
+    # Si la pieza no forma grupos ni donde cae ni tras la gravedad, el
+    # resultado es sólo la pieza apilada sobre cada columna: se evita la
+    # limpieza con numpy, que es lo caro
+    placed = [(y + i, x + j) for i, j in rotation.cells]
+    settled = settled_cells(heights, rotation, x, game.height)
+    if not forms_group(lines, placed, piece["color"]) and not forms_group(lines, settled, piece["color"]):
+        heights = heights.copy()
+        for _, column in settled:
+            heights[column] += 1
+        cleared = 0
+    else:
+        board = game.board.copy()
+        board.place(rotation, x, y, piece["color"])
+        cleared = board.clear_matches(MIN_MATCH)
+        heights = column_heights(board)
+    features = (*board_features(heights), cleared)
+    return sum(w * f for w, f in zip(weights, features))
+
+
+def best_placement(game, weights=DEFAULT_WEIGHTS):
+    """La colocación con mejor evaluación, o None si no hay ninguna"""
+    placements = enumerate_placements(game)
+    if not placements:
+        return None
+    heights = column_heights(game.board)
+    lines = color_lines(game.board)
+    return max(placements, key=lambda p: evaluate(game, *p, heights, lines, weights))
+
+
+def play_game(seed, weights=DEFAULT_WEIGHTS, max_pieces=1000):
+    """Juega una partida completa y devuelve su resumen"""
+    game = TetrisGame(seed=seed)
+    while not game.game_over and game.pieces_placed < max_pieces:
+        placement = best_placement(game, weights)
+        if placement is None:
+            break
+        turns, x, _ = placement
+        # Se juega con las reglas normales: girar, desplazar y soltar
+        for _ in range(turns):
+            game.rotate()
+        while game.current_x != x:
+            game.move(1 if x > game.current_x else -1, 0)
+        game.drop_piece()
+    return {"seed": seed, "score": game.score, "pieces": game.pieces_placed, "game_over": game.game_over}
+
+
+def _play_game_args(args):
+    return play_game(*args)
+
+
+def run_games(games, workers=None, seed=0, weights=DEFAULT_WEIGHTS, max_pieces=1000):
+    """Juega `games` partidas con semillas consecutivas en un pool de procesos"""
+    tasks = [(seed + i, weights, max_pieces) for i in range(games)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [_play_game_args(task) for task in tasks]
+    # Bloques de varias partidas para no pagar la comunicación por cada una
+    chunksize = max(1, games // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_play_game_args, tasks, chunksize=chunksize))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partidas de Tetris jugadas por el bot")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="Procesos (por defecto, uno por CPU)")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de la primera partida")
+    parser.add_argument("--max-pieces", type=int, default=1000)
+    parser.add_argument("--weights", type=float, nargs=4, default=DEFAULT_WEIGHTS,
+                        metavar=("ALTURA", "ALTURA_MAX", "IRREGULARIDAD", "GRUPOS"))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_games(args.games, args.workers, args.seed, tuple(args.weights), args.max_pieces)
+    elapsed = time.perf_counter() - start
+
+    scores = np.array([r["score"] for r in results])
+    pieces = sum(r["pieces"] for r in results)
+    print(f"{args.games} partidas en {elapsed:.2f} s: {args.games / elapsed * 60:,.0f} partidas/min, "
+          f"{pieces / elapsed:,.0f} piezas/s")
+    print(f"Puntuación media {scores.mean():.1f}, mediana {np.median(scores):.0f}, máxima {scores.max()}")
+
+
+if __name__ == "__main__":
+    main()
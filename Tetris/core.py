@@ -0,0 +1,126 @@
+"""
+Núcleo de Tetris sin interfaz
+Reglas del juego (piezas, movimientos, colocación y limpieza) con un
+generador aleatorio propio para poder reproducir partidas con una semilla.
+"""
+import random
+
+from board import SHAPES, Board, piece_rotations
+
+# Dimensiones del tablero
+BOARD_WIDTH = 10
+BOARD_HEIGHT = 20
+
+# Cantidad de colores; en el tablero se guardan como 1..NUM_COLORS
+NUM_COLORS = 7
+
+# Bloques del mismo color necesarios para eliminar una fila o columna
+MIN_MATCH = 5
+
+# Grupos eliminados para subir de nivel
+GROUPS_PER_LEVEL = 10
+
+# Segundos entre caídas en el nivel 1; cada nivel los multiplica por
+# GRAVITY_FACTOR sin bajar de MIN_GRAVITY_INTERVAL
+GRAVITY_INTERVAL = 0.5
+GRAVITY_FACTOR = 0.85
+MIN_GRAVITY_INTERVAL = 0.05
+
+
+def gravity_interval(level):
+    """Segundos entre dos pasos de gravedad en el nivel dado"""
+    return max(MIN_GRAVITY_INTERVAL, GRAVITY_INTERVAL * GRAVITY_FACTOR ** (level - 1))
+
+
+class TetrisGame:
+    """Estado y reglas de una partida de Tetris"""
+
+    def __init__(self, width=BOARD_WIDTH, height=BOARD_HEIGHT, seed=None, num_colors=NUM_COLORS):
+        self.width = width
+        self.height = height
+        self.num_colors = num_colors
+        self.random = random.Random(seed)
+        self.rotations = [piece_rotations(shape, width) for shape in SHAPES]
+
+        self.board = Board(width, height)
+        self.current_piece = self.new_piece()
+        self.current_x = width // 2 - 2
+        self.current_y = 0
+        self.score = 0
+        self.groups_cleared = 0
+        self.level = 1
+        self.game_over = False
+        self.pieces_placed = 0
+
+    def new_piece(self):
+        # "color" va de 1 a num_colors (0 = celda vacía)
+        kind = self.random.randrange(len(SHAPES))
+        color = self.random.randrange(self.num_colors) + 1
+        return {"shape": SHAPES[kind], "color": color, "kind": kind, "rotation": 0}
+
+    def piece_rotation(self, piece):
+        return self.rotations[piece["kind"]][piece["rotation"]]
+
+    def valid_move(self, piece, x, y):
+        return self.board.fits(self.piece_rotation(piece), x, y)
+
+    def place_piece(self):
+        piece = self.current_piece
+        self.board.place(self.piece_rotation(piece), self.current_x, self.current_y, piece["color"])
+        self.pieces_placed += 1
+
+        # Si la pieza quedó en la fila superior la partida termina
+        if self.current_y == 0:
+            self.game_over = True
+            return
+
+        self.clear_lines_and_columns()
+        self.current_piece = self.new_piece()
+        self.current_x = self.width // 2 - 2
+        self.current_y = 0
+        if not self.valid_move(self.current_piece, self.current_x, self.current_y):
+            self.game_over = True
+
+    def clear_lines_and_columns(self):
+        # 100 puntos por cada fila o columna eliminada, incluidas las cascadas
+        cleared = self.board.clear_matches(MIN_MATCH)
+        self.score += 100 * cleared
+        self.groups_cleared += cleared
+        self.level = 1 + self.groups_cleared // GROUPS_PER_LEVEL
+        return cleared
+
+    def move(self, dx, dy):
+        """Desplaza la pieza si es posible; devuelve True si se movió"""
+        new_x = self.current_x + dx
+        new_y = self.current_y + dy
+        if self.valid_move(self.current_piece, new_x, new_y):
+            self.current_x = new_x
+            self.current_y = new_y
+            return True
+        return False
+
+    def drop_piece(self):
+        """Hace caer la pieza hasta el fondo o hasta que colisione y la coloca"""
+        while self.valid_move(self.current_piece, self.current_x, self.current_y + 1):
+            self.current_y += 1
+        self.place_piece()
+
+    def rotate(self):
+        """Rota la pieza en sentido horario; devuelve True si se pudo"""
+        piece = self.current_piece
+        rotation = (piece["rotation"] + 1) % 4
+        if self.valid_move({**piece, "rotation": rotation}, self.current_x, self.current_y):
+            piece["rotation"] = rotation
+            piece["shape"] = self.rotations[piece["kind"]][rotation].shape
+            return True
+        return False
+
+    def tick(self):
+        """Un paso de gravedad: baja la pieza y la coloca si ya no puede bajar"""
+        if self.game_over:
+            return
+        self.move(0, 1)
+        if self.current_y + len(self.current_piece["shape"]) >= self.height or not self.valid_move(
+            self.current_piece, self.current_x, self.current_y + 1
+        ):
+            self.place_piece()
@@ -1,35 +1,679 @@
+import json
+import math
+import os
+import struct
+import sys
+import warnings
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, localcontext
+
 import numpy as np
-import matplotlib.pyplot as plt 
-from matplotlib import cm 
+
+def in_main_bulbs(c):
+    # Cardioide principal y bulbo de periodo 2: nunca escapan
+    x, y = c.real, c.imag
+    q = (x - 0.25) ** 2 + y * y
+    cardioid = q * (q + (x - 0.25)) <= 0.25 * y * y
+    bulb = (x + 1) ** 2 + y * y <= 0.0625
+    return cardioid | bulb
 
 def mandelbrot(c, max_iter):
+    if in_main_bulbs(c):
+        return max_iter
     z = 0
     n = 0
+    # Detección de ciclos (Brent): si la órbita repite un valor, no escapa
+    saved = z
+    check = 1
     while abs(z) <= 2 and n < max_iter:
         z = z**2 +c 
         n += 1
+        if z == saved:
+            return max_iter
+        if n == check:
+            saved = z
+            check *= 2
     return n
 
+def complex_plane(xmin, xmax, ymin, ymax, width, height):
+    x = np.linspace(xmin, xmax, width)
+    y = np.linspace(ymin, ymax, height)
+    return x[np.newaxis, :] + 1j * y[:, np.newaxis]
+
+def escape_time(c, max_iter, smooth=None):
+    # Itera todos los puntos a la vez; los que escapan o entran en un ciclo
+    # salen del arreglo activo. Los puntos interiores conservan max_iter.
+    # Si se pasa `smooth` (misma forma que c) se rellena en la misma pasada
+    # con la iteración continua n + 1 - log2(log|z_n|).
+    counts = np.full(c.shape, max_iter, dtype=np.int64)
+    flat_c = c.ravel()
+    flat_counts = counts.ravel()
+    if smooth is not None:
+        smooth.fill(max_iter)
+        flat_smooth = smooth.reshape(-1)
+    index = np.flatnonzero(~in_main_bulbs(flat_c))
+    active_c = flat_c[index]
+    z = np.zeros_like(active_c)
+    saved = z.copy()
+    check = 1
+
+    for n in range(max_iter):
+        if index.size == 0:
+            break
+        magnitude = np.abs(z)
+        inside = magnitude <= 2
+        if not inside.all():
+            flat_counts[index[~inside]] = n
+            if smooth is not None:
+                flat_smooth[index[~inside]] = n + 1 - np.log2(np.log(magnitude[~inside]))
+            index = index[inside]
+            z = z[inside]
+            saved = saved[inside]
+            active_c = active_c[inside]
+        z = z * z + active_c
+
+        cyclic = z == saved
+        if cyclic.any():
+            keep = ~cyclic
+            index = index[keep]
+            z = z[keep]
+            saved = saved[keep]
+            active_c = active_c[keep]
+        if n + 1 == check:
+            saved = z.copy()
+            check *= 2
+
+    return counts
+
 def generate_fractal(xmin, xmax, ymin, ymax, width, height, max_iter):
+    c = complex_plane(xmin, xmax, ymin, ymax, width, height)
+    return escape_time(c, max_iter).astype(np.float64)
+
+# Paleta por defecto (similar a magma) sin depender de matplotlib
+PALETTE_ANCHORS = [
+    (0.00, (0, 0, 4)),
+    (0.25, (81, 18, 124)),
+    (0.50, (183, 55, 121)),
+    (0.75, (252, 137, 97)),
+    (1.00, (252, 253, 191)),
+]
+
+def make_palette(anchors=PALETTE_ANCHORS, size=256):
+    positions = [p for p, _ in anchors]
+    t = np.linspace(0, 1, size)
+    channels = [np.interp(t, positions, [color[k] for _, color in anchors]) for k in range(3)]
+    return np.stack(channels, axis=1).round().astype(np.uint8)
+
+def colorize(counts, smooth, max_iter, palette=None, interior=(0, 0, 0)):
+    # Ecualización por histograma de la iteración continua: cada valor se
+    # mapea a su posición en la distribución acumulada de píxeles escapados.
+    # Necesita el histograma global, así que es una segunda pasada sobre la
+    # imagen; se hace en el lugar con un buffer float32 y otro int32.
+    palette = make_palette() if palette is None else palette
+    inside = counts >= max_iter
+    # Los píxeles interiores van a una banda extra que no cuenta en el histograma
+    extra = max_iter + 3
+    bands = smooth.astype(np.int32)
+    bands[inside] = extra
+    hist = np.bincount(bands.ravel(), minlength=extra + 1)
+    hist[extra] = 0
+    total = max(int(hist.sum()), 1)
+    cdf_before = (np.concatenate(([0], np.cumsum(hist)[:-1])) / total).astype(np.float32)
+    width = (hist / total).astype(np.float32)
+
+    level = np.subtract(smooth, bands, dtype=np.float32)
+    level *= width[bands]
+    level += cdf_before[bands]
+    level *= len(palette)
+    bands[...] = level
+    np.minimum(bands, len(palette) - 1, out=bands)
+    rgb = palette[bands]
+    rgb[inside] = interior
+    return rgb
+
+def generate_fractal_rgb(xmin, xmax, ymin, ymax, width, height, max_iter, palette=None):
+    # Devuelve la imagen RGB uint8 y la iteración continua normalizada a [0, 1]
+    c = complex_plane(xmin, xmax, ymin, ymax, width, height)
+    smooth = np.empty(c.shape, dtype=np.float32)
+    counts = escape_time(c, max_iter, smooth)
+    rgb = colorize(counts, smooth, max_iter, palette)
+    smooth /= max_iter + 2
+    return rgb, smooth
+
+def write_png(path, rgb):
+    # Codificador PNG mínimo (RGB de 8 bits, sin filtros)
+    height, width, _ = rgb.shape
+    raw = np.zeros((height, 1 + 3 * width), dtype=np.uint8)
+    raw[:, 1:] = rgb.reshape(height, -1)
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+
+def _render_tile(x, y, max_iter):
+    c = x[np.newaxis, :] + 1j * y[:, np.newaxis]
+    return escape_time(c, max_iter)
+
+def split_tiles(width, height, tile_size):
+    # Divide la imagen en bloques (fila0, fila1, col0, col1)
+    tile_w, tile_h = tile_size
+    return [
+        (i, min(i + tile_h, height), j, min(j + tile_w, width))
+        for i in range(0, height, tile_h)
+        for j in range(0, width, tile_w)
+    ]
+
+def generate_fractal_tiled(xmin, xmax, ymin, ymax, width, height, max_iter,
+                           tile_size=(None, 16), workers=None):
+    # tile_size = (ancho, alto); ancho None = bandas de filas completas
+    workers = workers or os.cpu_count() or 1
+    tile_w, tile_h = tile_size
+    tiles = split_tiles(width, height, (tile_w or width, tile_h or height))
+
     x = np.linspace(xmin, xmax, width)
     y = np.linspace(ymin, ymax, height)
     fractal = np.zeros((height, width))
 
-    for i in range(height):
-        for j in range(width):
-            fractal[i, j] = mandelbrot(x[j] + 1j*y[i], max_iter)
-    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_render_tile, x[j0:j1], y[i0:i1], max_iter)
+            for i0, i1, j0, j1 in tiles
+        ]
+        for (i0, i1, j0, j1), future in zip(tiles, futures):
+            fractal[i0:i1, j0:j1] = future.result()
+
     return fractal
 
-xmin, xmax = -2, 1
-ymin, ymax = -1.5, 1.5
-width, height = 800, 600
-max_iter = 50
+def count_dtype(max_iter):
+    return np.uint16 if max_iter <= np.iinfo(np.uint16).max else np.uint32
+
+def _load_progress(progress_path, params):
+    if not os.path.exists(progress_path):
+        return None
+    with open(progress_path) as f:
+        progress = json.load(f)
+    if progress["params"] != params:
+        return None
+    return set(progress["done"])
+
+def _save_progress(progress_path, params, done):
+    tmp_path = progress_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"params": params, "done": sorted(done)}, f)
+    os.replace(tmp_path, progress_path)
+
+def render_to_memmap(path, xmin, xmax, ymin, ymax, width, height, max_iter,
+                     band_rows=None, workers=1, resume=True):
+    # Escribe el fractal por bandas en un .npy mapeado en disco (uint16/uint32).
+    # El progreso se guarda junto al archivo para poder reanudar el render;
+    # al terminar queda con todas las bandas hechas y un render completo se
+    # devuelve tal cual en lugar de recalcularlo.
+    dtype = count_dtype(max_iter)
+    band_rows = band_rows or max(1, 2**22 // width)
+    bands = split_tiles(width, height, (width, band_rows))
+    progress_path = path + ".progress.json"
+    params = [xmin, xmax, ymin, ymax, width, height, max_iter, band_rows]
+
+    done = _load_progress(progress_path, params) if resume and os.path.exists(path) else None
+    if done is None:
+        done = set()
+        fractal = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(height, width))
+        _save_progress(progress_path, params, done)
+    else:
+        fractal = np.lib.format.open_memmap(path, mode="r+")
+
+    x = np.linspace(xmin, xmax, width)
+    y = np.linspace(ymin, ymax, height)
+    pending = [band for band in bands if band[0] not in done]
+    if not pending:
+        return fractal
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Lotes de `workers` bandas para no acumular resultados en memoria
+        for k in range(0, len(pending), workers):
+            batch = pending[k:k + workers]
+            results = executor.map(
+                _render_tile,
+                [x] * len(batch),
+                [y[i0:i1] for i0, i1, _, _ in batch],
+                [max_iter] * len(batch),
+            )
+            for (i0, i1, _, _), band in zip(batch, results):
+                fractal[i0:i1] = band
+                done.add(i0)
+            fractal.flush()
+            _save_progress(progress_path, params, done)
+
+    return fractal
+
+def reference_orbit(cx, cy, max_iter, precision):
+    # Órbita de referencia en alta precisión (Decimal), devuelta en float64.
+    # Incluye el primer valor que escapa, si lo hay.
+    orbit = [0j]
+    with localcontext() as ctx:
+        ctx.prec = precision
+        zr = zi = Decimal(0)
+        for _ in range(max_iter):
+            zr, zi = zr * zr - zi * zi + cx, 2 * zr * zi + cy
+            orbit.append(complex(float(zr), float(zi)))
+            if zr * zr + zi * zi > 4:
+                break
+    return np.array(orbit)
+
+def _perturbation_pass(orbit, dc, max_iter):
+    # z_n = Z_n + dz_n con dz_{n+1} = 2 Z_n dz_n + dz_n^2 + dc, todo en float64.
+    # Los píxeles abandonados (glitch o referencia agotada) quedan marcados
+    # con la iteración n en que se dejaron y su |z_n| en ese momento.
+    counts = np.full(dc.size, max_iter, dtype=np.int64)
+    abandoned_at = np.full(dc.size, -1, dtype=np.int64)
+    abandoned_mag = np.full(dc.size, np.inf)
+    index = np.arange(dc.size)
+    active_dc = dc.copy()
+    dz = np.zeros_like(dc)
+    last = len(orbit) - 1
+
+    for n in range(max_iter):
+        if index.size == 0:
+            break
+        ref = orbit[n]
+        mag = np.abs(ref + dz)
+        done = mag > 2
+        counts[index[done]] = n
+
+        if n == last:
+            # La referencia escapó antes: el resto necesita otra referencia
+            abandoned_at[index[~done]] = n
+            abandoned_mag[index[~done]] = mag[~done]
+            break
+        # Criterio de Pauldelbrot: |Z_n + dz_n| << |Z_n| pierde precisión
+        ratio = mag / abs(ref) if ref != 0 else np.full(mag.shape, np.inf)
+        glitched = (ratio < 1e-3) & ~done
+        abandoned_at[index[glitched]] = n
+        abandoned_mag[index[glitched]] = mag[glitched]
+        done |= glitched
+
+        if done.any():
+            keep = ~done
+            index = index[keep]
+            dz = dz[keep]
+            active_dc = active_dc[keep]
+        dz = 2 * ref * dz + dz * dz + active_dc
+
+    return counts, abandoned_at, abandoned_mag
+
+def generate_deep_zoom(center_x, center_y, span, width, height, max_iter,
+                       precision=None, max_references=20):
+    # center_x, center_y y span se pasan como str/Decimal para no perder
+    # dígitos. Sólo la órbita de referencia se calcula en Decimal; cada
+    # píxel es una perturbación en float64 (válido hasta span ~ 1e-300).
+    # Los píxeles que siguen sin resolver tras max_references referencias
+    # se devuelven como NaN (con un aviso) en lugar de como interiores.
+    center_x, center_y, span = Decimal(center_x), Decimal(center_y), Decimal(span)
+    if precision is None:
+        precision = max(30, int(-span.log10()) + 20)
+    span_x = span
+    span_y = span * height / width
+
+    offsets_x = np.linspace(-0.5, 0.5, width) * float(span_x)
+    offsets_y = np.linspace(-0.5, 0.5, height) * float(span_y)
+    dc = (offsets_x[np.newaxis, :] + 1j * offsets_y[:, np.newaxis]).ravel()
+
+    counts = np.full(dc.size, max_iter, dtype=np.float64)
+    pending = np.arange(dc.size)
+    ref_x, ref_y, ref_dc = center_x, center_y, 0j
+
+    for _ in range(max_references):
+        orbit = reference_orbit(ref_x, ref_y, max_iter, precision)
+        pass_counts, abandoned_at, abandoned_mag = _perturbation_pass(
+            orbit, dc[pending] - ref_dc, max_iter
+        )
+        abandoned = abandoned_at >= 0
+        counts[pending[~abandoned]] = pass_counts[~abandoned]
+        if not abandoned.any():
+            pending = pending[:0]
+            break
+
+        # Nueva referencia: el píxel pendiente que llegó más lejos y, entre
+        # ellos, el de menor |z|, que es el que más tarda en escapar
+        best = pending[np.lexsort((abandoned_mag, -abandoned_at))[0]]
+        pending = pending[abandoned]
+        i, j = divmod(int(best), width)
+        with localcontext() as ctx:
+            ctx.prec = precision
+            ref_x = center_x + (Decimal(j) / max(width - 1, 1) - Decimal("0.5")) * span_x
+            ref_y = center_y + (Decimal(i) / max(height - 1, 1) - Decimal("0.5")) * span_y
+        ref_dc = dc[best]
+
+    if pending.size:
+        counts[pending] = np.nan
+        warnings.warn(
+            f"{pending.size} píxeles sin resolver tras {max_references} referencias "
+            "(NaN); aumentar max_references",
+            RuntimeWarning,
+        )
+    return counts.reshape(height, width)
+
+def generate_fractal_progressive(xmin, xmax, ymin, ymax, width, height, max_iter,
+                                 steps=(8, 4, 2, 1)):
+    # Genera vistas previas cada vez más finas; cada nivel sólo calcula las
+    # muestras nuevas y reutiliza las de los niveles anteriores
+    x = np.linspace(xmin, xmax, width)
+    y = np.linspace(ymin, ymax, height)
+    counts = np.zeros((height, width), dtype=np.int64)
+    known = np.zeros((height, width), dtype=bool)
+
+    for step in steps:
+        rows = np.arange(0, height, step)
+        cols = np.arange(0, width, step)
+        grid = np.ix_(rows, cols)
+        missing = ~known[grid]
+        c = x[np.newaxis, cols] + 1j * y[rows, np.newaxis]
+        sample = counts[grid]
+        sample[missing] = escape_time(c[missing], max_iter)
+        counts[grid] = sample
+        known[grid] = True
+
+        # Cada muestra rellena su bloque step x step
+        preview = np.repeat(np.repeat(sample, step, axis=0), step, axis=1)
+        yield step, preview[:height, :width].astype(np.float64)
+
+def _rect_border(i0, i1, j0, j1, width):
+    # Índices planos del borde de un rectángulo con límites inclusivos
+    rows = np.arange(i0, i1 + 1)
+    cols = np.arange(j0, j1 + 1)
+    return np.concatenate([
+        i0 * width + cols, i1 * width + cols,
+        rows[1:-1] * width + j0, rows[1:-1] * width + j1,
+    ])
+
+def generate_fractal_subdivided(xmin, xmax, ymin, ymax, width, height, max_iter,
+                                min_size=8):
+    # Mariani-Silver: si todo el borde de un rectángulo tiene el mismo número
+    # de iteraciones se rellena el interior; si no, se divide en cuatro.
+    # Cada nivel de subdivisión se calcula en una sola llamada vectorizada.
+    x = np.linspace(xmin, xmax, width)
+    y = np.linspace(ymin, ymax, height)
+    counts = np.zeros(height * width, dtype=np.int64)
+    known = np.zeros(height * width, dtype=bool)
+
+    def compute(index):
+        pending = np.zeros(height * width, dtype=bool)
+        pending[index] = True
+        index = np.flatnonzero(pending & ~known)
+        if index.size:
+            c = x[index % width] + 1j * y[index // width]
+            counts[index] = escape_time(c, max_iter)
+            known[index] = True
+
+    # Rectángulos (fila0, fila1, col0, col1) con límites inclusivos
+    rects = [(0, height - 1, 0, width - 1)]
+    while rects:
+        small, large = [], []
+        for r in rects:
+            (small if r[1] - r[0] < min_size or r[3] - r[2] < min_size else large).append(r)
+        borders = [_rect_border(*r, width) for r in large]
+        leaves = [
+            (np.arange(i0, i1 + 1)[:, np.newaxis] * width + np.arange(j0, j1 + 1)).ravel()
+            for i0, i1, j0, j1 in small
+        ]
+        if borders or leaves:
+            compute(np.concatenate(borders + leaves))
+
+        rects = []
+        for (i0, i1, j0, j1), border in zip(large, borders):
+            values = counts[border]
+            if (values == values[0]).all():
+                interior = counts.reshape(height, width)[i0 + 1:i1, j0 + 1:j1]
+                interior[...] = values[0]
+                known.reshape(height, width)[i0 + 1:i1, j0 + 1:j1] = True
+                continue
+            im = (i0 + i1) // 2
+            jm = (j0 + j1) // 2
+            rects.extend([
+                (i0, im, j0, jm), (i0, im, jm, j1),
+                (im, i1, j0, jm), (im, i1, jm, j1),
+            ])
+
+    return counts.reshape(height, width).astype(np.float64)
+
+def _interior_neighbourhood(counts, max_iter, radius=4):
+    # True donde toda la ventana (2 * radius + 1)^2 alrededor del píxel es
+    # interior; erosión separable: primero por filas y luego por columnas
+    inside = counts >= max_iter
+    height, width = inside.shape
+    rows = np.zeros(inside.shape, dtype=bool)
+    rows[radius:height - radius] = inside[2 * radius:]
+    for d in range(2 * radius):
+        rows[radius:height - radius] &= inside[d:height - 2 * radius + d]
+    interior = np.zeros(inside.shape, dtype=bool)
+    interior[:, radius:width - radius] = rows[:, 2 * radius:]
+    for d in range(2 * radius):
+        interior[:, radius:width - radius] &= rows[:, d:width - 2 * radius + d]
+    return interior
+
+def _render_zoom_chunk(center_x, center_y, spans, width, height, max_iter, palette):
+    # Renderiza fotogramas consecutivos reutilizando el anterior: sólo se
+    # copian los píxeles interiores (max_iter, los más caros) cuyo vecino
+    # más cercano del fotograma previo está rodeado de interior en una
+    # ventana de 9x9; los píxeles que escapan se calculan siempre, así su
+    # iteración continua no se copia en bloques
+    frames = []
+    previous = None
+    for span in spans:
+        half_x, half_y = span / 2, span * height / width / 2
+        view = (center_x - half_x, center_x + half_x, center_y - half_y, center_y + half_y)
+        c = complex_plane(*view, width, height)
+        counts = np.empty(c.shape, dtype=np.int64)
+        smooth = np.empty(c.shape, dtype=np.float32)
+        todo = np.ones(c.shape, dtype=bool)
+
+        if previous is not None:
+            prev_interior, prev_view = previous
+            cols = np.rint((c.real[0] - prev_view[0]) / (prev_view[1] - prev_view[0]) * (width - 1)).astype(np.int64)
+            rows = np.rint((c.imag[:, 0] - prev_view[2]) / (prev_view[3] - prev_view[2]) * (height - 1)).astype(np.int64)
+            cols = np.clip(cols, 0, width - 1)
+            rows = np.clip(rows, 0, height - 1)
+            reuse = prev_interior[np.ix_(rows, cols)]
+            # En los interiores colorize no usa la iteración continua
+            counts[reuse] = max_iter
+            smooth[reuse] = max_iter
+            todo = ~reuse
+
+        part_smooth = np.empty(int(todo.sum()), dtype=np.float32)
+        counts[todo] = escape_time(c[todo], max_iter, part_smooth)
+        smooth[todo] = part_smooth
+
+        frames.append(colorize(counts, smooth, max_iter, palette)[::-1])
+        previous = (_interior_neighbourhood(counts, max_iter), view)
+    return frames
+
+def render_zoom_sequence(center_x, center_y, start_span, end_span, frames, output,
+                         width=800, height=600, max_iter=500, raw=False,
+                         workers=None, chunk_frames=8, palette=None):
+    # Zoom geométrico de start_span a end_span hacia (center_x, center_y).
+    # Los bloques de `chunk_frames` fotogramas se reparten entre procesos.
+    # raw=False: PNG numerados en el directorio `output`
+    # raw=True: RGB24 concatenado en `output` ("-" = stdout), p. ej. para
+    #   ffmpeg -f rawvideo -pix_fmt rgb24 -s {width}x{height} -i -
+    palette = make_palette() if palette is None else palette
+    ratio = end_span / start_span
+    spans = [start_span * ratio ** (k / max(frames - 1, 1)) for k in range(frames)]
+    chunks = [spans[k:k + chunk_frames] for k in range(0, frames, chunk_frames)]
+
+    if raw:
+        stream = sys.stdout.buffer if output == "-" else open(output, "wb")
+    else:
+        os.makedirs(output, exist_ok=True)
+
+    written = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                _render_zoom_chunk,
+                [center_x] * len(chunks), [center_y] * len(chunks), chunks,
+                [width] * len(chunks), [height] * len(chunks),
+                [max_iter] * len(chunks), [palette] * len(chunks),
+            )
+            for chunk in results:
+                for rgb in chunk:
+                    if raw:
+                        stream.write(rgb.tobytes())
+                    else:
+                        write_png(os.path.join(output, f"frame_{written:05d}.png"), rgb)
+                    written += 1
+    finally:
+        if raw and stream is not sys.stdout.buffer:
+            stream.close()
+    return written
+
+# Quadtree de teselas: en el nivel 0 una tesela cubre todo WORLD_BOUNDS
+TILE_SIZE = 128
+WORLD_BOUNDS = (-2.5, 1.5, -2.0, 2.0)
+
+def tile_bounds(level, tx, ty):
+    span = (WORLD_BOUNDS[1] - WORLD_BOUNDS[0]) / 2**level
+    return WORLD_BOUNDS[0] + tx * span, WORLD_BOUNDS[2] + ty * span, span
+
+def render_quadtree_tile(level, tx, ty, max_iter):
+    x0, y0, span = tile_bounds(level, tx, ty)
+    centers = (np.arange(TILE_SIZE) + 0.5) * (span / TILE_SIZE)
+    return _render_tile(x0 + centers, y0 + centers, max_iter).astype(count_dtype(max_iter))
+
+class TileCache:
+    """Caché LRU de teselas (nivel, tx, ty, max_iter) con límite de memoria"""
+
+    def __init__(self, max_bytes=64 * 2**20):
+        self.max_bytes = max_bytes
+        self.tiles = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, level, tx, ty, max_iter):
+        key = (level, tx, ty, max_iter)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            self.hits += 1
+            return tile
+
+        self.misses += 1
+        tile = render_quadtree_tile(level, tx, ty, max_iter)
+        self.tiles[key] = tile
+        self.nbytes += tile.nbytes
+        # Expulsar las menos usadas recientemente
+        while self.nbytes > self.max_bytes and len(self.tiles) > 1:
+            _, old = self.tiles.popitem(last=False)
+            self.nbytes -= old.nbytes
+        return tile
+
+def render_view(cache, xmin, xmax, ymin, ymax, width, height, max_iter):
+    # Nivel cuyo píxel de tesela no sea mayor que el píxel de la vista
+    pixel = min((xmax - xmin) / width, (ymax - ymin) / height)
+    world_span = WORLD_BOUNDS[1] - WORLD_BOUNDS[0]
+    level = max(0, math.ceil(math.log2(world_span / (TILE_SIZE * pixel))))
+    span = world_span / 2**level
+
+    # Posición de cada píxel de la vista dentro de la cuadrícula de teselas
+    gx = (np.linspace(xmin, xmax, width) - WORLD_BOUNDS[0]) / span
+    gy = (np.linspace(ymin, ymax, height) - WORLD_BOUNDS[2]) / span
+    tile_x = np.floor(gx).astype(np.int64)
+    tile_y = np.floor(gy).astype(np.int64)
+    px = np.minimum(((gx - tile_x) * TILE_SIZE).astype(np.int64), TILE_SIZE - 1)
+    py = np.minimum(((gy - tile_y) * TILE_SIZE).astype(np.int64), TILE_SIZE - 1)
+
+    view = np.zeros((height, width), dtype=count_dtype(max_iter))
+    for ty in np.unique(tile_y):
+        rows = np.flatnonzero(tile_y == ty)
+        for tx in np.unique(tile_x):
+            cols = np.flatnonzero(tile_x == tx)
+            tile = cache.get(level, int(tx), int(ty), max_iter)
+            view[np.ix_(rows, cols)] = tile[np.ix_(py[rows], px[cols])]
+    return view
+
+def explore(xmin=-2, xmax=1, ymin=-1.5, ymax=1.5, width=800, height=600,
+            max_iter=200, cache_bytes=64 * 2**20):
+    # Explorador interactivo: rueda = zoom, arrastrar = desplazar
+    import matplotlib.pyplot as plt
+    from matplotlib import cm
+
+    cache = TileCache(cache_bytes)
+    view = [xmin, xmax, ymin, ymax]
+    drag = {}
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    image = ax.imshow(render_view(cache, *view, width, height, max_iter),
+                      cmap=cm.magma, origin="lower", extent=view)
+
+    def redraw():
+        image.set_data(render_view(cache, *view, width, height, max_iter))
+        image.set_extent(view)
+        ax.set_xlim(view[0], view[1])
+        ax.set_ylim(view[2], view[3])
+        ax.set_title(f"Teselas: {len(cache.tiles)}  aciertos: {cache.hits}  fallos: {cache.misses}")
+        fig.canvas.draw_idle()
+
+    def on_scroll(event):
+        if event.xdata is None:
+            return
+        factor = 0.5 if event.button == "up" else 2.0
+        view[0] = event.xdata + (view[0] - event.xdata) * factor
+        view[1] = event.xdata + (view[1] - event.xdata) * factor
+        view[2] = event.ydata + (view[2] - event.ydata) * factor
+        view[3] = event.ydata + (view[3] - event.ydata) * factor
+        redraw()
+
+    def on_press(event):
+        if event.xdata is not None:
+            drag["start"] = (event.xdata, event.ydata)
+
+    def on_release(event):
+        start = drag.pop("start", None)
+        if start is None or event.xdata is None:
+            return
+        dx, dy = start[0] - event.xdata, start[1] - event.ydata
+        view[0] += dx
+        view[1] += dx
+        view[2] += dy
+        view[3] += dy
+        redraw()
+
+    fig.canvas.mpl_connect("scroll_event", on_scroll)
+    fig.canvas.mpl_connect("button_press_event", on_press)
+    fig.canvas.mpl_connect("button_release_event", on_release)
+    redraw()
+    plt.show()
+
+if __name__ == "__main__":
+    xmin, xmax = -2, 1
+    ymin, ymax = -1.5, 1.5
+    width, height = 800, 600
+    max_iter = 50
+
+    if "--explore" in sys.argv:
+        explore(xmin, xmax, ymin, ymax, width, height)
+        sys.exit()
+
+    if "--png" in sys.argv:
+        path = sys.argv[sys.argv.index("--png") + 1]
+        rgb, _ = generate_fractal_rgb(xmin, xmax, ymin, ymax, width, height, max_iter)
+        write_png(path, rgb[::-1])
+        sys.exit()
 
+    import matplotlib.pyplot as plt
+    from matplotlib import cm
 
-fractal = generate_fractal(xmin, xmax, ymin, ymax, width, height, max_iter)
+    fractal = generate_fractal(xmin, xmax, ymin, ymax, width, height, max_iter)
 
-plt.figure(figsize=(10,8))
-plt.imshow(fractal, cmap=cm.magma, extent=(xmin, xmax, ymin, ymax))
-plt.colorbar(label= "Iteraciones")
-plt.show()
\ No newline at end of file
+    plt.figure(figsize=(10,8))
+    plt.imshow(fractal, cmap=cm.magma, extent=(xmin, xmax, ymin, ymax))
+    plt.colorbar(label= "Iteraciones")
+    plt.show()
\ No newline at end of file
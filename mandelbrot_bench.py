@@ -0,0 +1,140 @@
+"""
+Benchmark de los renderizadores de mandelbrot.py
+Mide tiempo, píxeles por segundo y memoria pico sin abrir ventanas, y
+compara contra una línea base guardada para detectar regresiones.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import mandelbrot
+
+
+RESOLUTIONS = [(400, 300), (800, 600), (1600, 1200)]
+MAX_ITERS = [50, 200, 1000]
+VIEWPORTS = {
+    "completo": (-2, 1, -1.5, 1.5),
+    "valle": (-0.75, -0.74, 0.1, 0.11),
+    "espiral": (-0.7436447860, -0.7436438870, 0.1318252536, 0.1318259738),
+}
+
+
+def _last(generator):
+    result = None
+    for _, result in generator:
+        pass
+    return result
+
+
+RENDERERS = {
+    "vectorizado": mandelbrot.generate_fractal,
+    "teselas": mandelbrot.generate_fractal_tiled,
+    "subdivision": mandelbrot.generate_fractal_subdivided,
+    "progresivo": lambda *args: _last(mandelbrot.generate_fractal_progressive(*args)),
+}
+
+
+def case_key(renderer, width, height, max_iter, viewport):
+    return f"{renderer}/{width}x{height}/{max_iter}/{viewport}"
+
+
+def run_case(render, args, repeat):
+    """Devuelve el mejor tiempo de `repeat` ejecuciones y la memoria pico"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(*args)
+        times.append(time.perf_counter() - start)
+
+    # Medición de memoria aparte para no alterar los tiempos
+    # (en "teselas" sólo cuenta el proceso principal)
+    tracemalloc.start()
+    render(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def run_benchmarks(renderers, resolutions, max_iters, viewports, repeat):
+    results = []
+    for name in renderers:
+        for width, height in resolutions:
+            for max_iter in max_iters:
+                for view_name in viewports:
+                    args = (*VIEWPORTS[view_name], width, height, max_iter)
+                    seconds, peak = run_case(RENDERERS[name], args, repeat)
+                    result = {
+                        "case": case_key(name, width, height, max_iter, view_name),
+                        "seconds": seconds,
+                        "pixels_per_second": width * height / seconds,
+                        "peak_memory_bytes": peak,
+                    }
+                    results.append(result)
+                    print(f"{result['case']:<40} {seconds:9.4f} s "
+                          f"{result['pixels_per_second'] / 1e6:8.2f} Mpx/s "
+                          f"{peak / 2**20:8.1f} MiB")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Imprime la aceleración respecto a la línea base y devuelve las regresiones"""
+    previous = {r["case"]: r for r in baseline["results"]}
+    regressions = []
+    print("\nComparación con la línea base:")
+    for result in results:
+        old = previous.get(result["case"])
+        if old is None:
+            continue
+        speedup = old["seconds"] / result["seconds"]
+        mark = ""
+        if result["seconds"] > old["seconds"] * (1 + tolerance):
+            regressions.append(result["case"])
+            mark = "  <-- REGRESIÓN"
+        print(f"{result['case']:<40} x{speedup:6.2f}{mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de mandelbrot.py")
+    parser.add_argument("--renderers", nargs="+", default=["vectorizado"], choices=list(RENDERERS))
+    parser.add_argument("--resolutions", nargs="+", default=[f"{w}x{h}" for w, h in RESOLUTIONS])
+    parser.add_argument("--max-iter", nargs="+", type=int, default=MAX_ITERS)
+    parser.add_argument("--viewports", nargs="+", default=list(VIEWPORTS), choices=list(VIEWPORTS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="JSON de una ejecución anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Fracción de tiempo extra permitida antes de marcar regresión")
+    args = parser.parse_args()
+
+    # La línea base se lee antes de escribir: --output puede ser el mismo archivo
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    resolutions = [tuple(int(v) for v in r.split("x")) for r in args.resolutions]
+    results = run_benchmarks(args.renderers, resolutions, args.max_iter, args.viewports, args.repeat)
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "results": results,
+        }, f, indent=2)
+    print(f"\nResultados guardados en {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,53 @@
 Simulador de Ondas de Agua - Propagación y Física
 Simulación zen de ondas que se propagan al hacer clic
 """
-import flet as ft
+from __future__ import annotations
+
 import math
+import argparse
 import asyncio
+import base64
+import functools
+import random
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+try:
+    import flet as ft
+except ImportError:  # el modo por lotes (--headless) funciona sin Flet
+    ft = None
+
+
+def encode_png(rgb):
+    """Codifica una imagen RGB uint8 (filas, columnas, 3) como PNG en memoria"""
+    height, width, _ = rgb.shape
+    raw = np.zeros((height, 1 + 3 * width), dtype=np.uint8)
+    raw[:, 1:] = rgb.reshape(height, -1)
+    
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+    
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(raw.tobytes(), 1)),
+        chunk(b"IEND", b""),
+    ])
+
+
+def default_palette():
+    """Paleta original: agua oscura en reposo, más clara en crestas"""
+    # Más allá de 155 niveles de intensidad el color ya no cambia
+    intensity = np.arange(156)
+    palette = np.zeros((len(intensity), 3), dtype=np.uint8)
+    palette[:, 1] = np.minimum(180, 50 + intensity)
+    palette[:, 2] = np.minimum(255, 100 + intensity)
+    return palette
 
 
 class WavePoint:
@@ -37,21 +81,66 @@ class WavePoint:
             wave_value = math.sin((distance - wave_position) * 0.5) * self.amplitude * attenuation
             return wave_value
         return 0
+    
+    def get_ring(self):
+        """Radio del anillo y semiancho de la zona donde la influencia no es cero"""
+        wave_speed = 3
+        wave_position = self.age * wave_speed
+        return wave_position, 10
+    
+    def get_influence_grid(self, distance):
+        """Calcula la influencia sobre una matriz de distancias (vectorizado)"""
+        wave_speed = 3
+        wave_position = self.age * wave_speed
+        
+        offset = distance - wave_position
+        ring = np.abs(offset) < 10
+        attenuation = 1 - (self.age / self.max_age)
+        wave_value = np.zeros_like(distance)
+        wave_value[ring] = np.sin(offset[ring] * 0.5) * self.amplitude * attenuation
+        return wave_value
 
 
 class WaterGrid:
-    """Representa una cuadrícula de puntos de agua"""
+    """Representa una cuadrícula de puntos de agua
     
-    def __init__(self, width, height, resolution=15):
+    solver="rings": anillos analíticos generados por cada WavePoint.
+    solver="wave": ecuación de onda 2D por diferencias finitas; el costo por
+    paso es O(celdas) sin importar cuántas gotas haya activas.
+    threads > 1 reparte el paso de "wave" en franjas horizontales; el pool
+    de hilos se crea en el primer paso que lo usa y se libera con close().
+    """
+    
+    def __init__(self, width, height, resolution=15, solver="rings",
+                 substeps=1, border="reflective", threads=1):
         self.width = width
         self.height = height
         self.resolution = resolution
         self.cols = width // resolution
         self.rows = height // resolution
+        self.solver = solver
+        self.substeps = substeps
+        self.border = border
+        
+        # Franjas de filas [inicio, fin) para el paso en paralelo; cada una lee
+        # una fila de halo de sus vecinas a través de padded_heights
+        self.threads = threads
+        bounds = np.linspace(0, height // resolution, threads + 1).astype(int)
+        self.stripes = [(r0, r1) for r0, r1 in zip(bounds[:-1], bounds[1:]) if r1 > r0]
+        self.executor = None
+        
+        # Matriz de altura de agua: vista interior de un arreglo con una
+        # celda fantasma por lado para el estencil del laplaciano
+        self.padded_heights = np.zeros((self.rows + 2, self.cols + 2))
+        self.heights = self.padded_heights[1:-1, 1:-1]
+        self.velocities = np.zeros((self.rows, self.cols))
         
-        # Matriz de altura de agua
-        self.heights = [[0.0 for _ in range(self.cols)] for _ in range(self.rows)]
-        self.velocities = [[0.0 for _ in range(self.cols)] for _ in range(self.rows)]
+        # Buffers preasignados para el paso de la ecuación de onda
+        self.laplacian = np.zeros((self.rows, self.cols))
+        self.scratch = np.zeros((self.rows, self.cols))
+        
+        # Tabla de colores: la altura se cuantiza a un índice de la paleta
+        self.set_palette(default_palette())
         
         # Ondas activas
         self.waves = []
@@ -59,83 +148,272 @@ class WaterGrid:
         # Parámetros físicos
         self.damping = 0.98
         self.spread = 0.5
+        
+        # Perfil de la gota que se suma al campo en modo "wave": un valle de
+        # radio drop_radius rodeado de una cresta en anillo hasta el doble del
+        # radio, escalada para que el volumen total sea cero. Con bordes
+        # reflectivos el volumen se conserva, así el nivel en reposo no baja.
+        self.drop_radius = 3
+        self.drop_amplitude = -30
+        extent = 2 * self.drop_radius
+        offsets = np.arange(-extent, extent + 1)
+        distance = np.sqrt(offsets[:, np.newaxis] ** 2 + offsets[np.newaxis, :] ** 2) / self.drop_radius
+        trough = np.clip(np.cos(distance * math.pi / 2), 0, None) * (distance <= 1)
+        crest = np.sin((distance - 1) * math.pi) * ((distance > 1) & (distance < 2))
+        self.drop_shape = self.drop_amplitude * (trough - crest * trough.sum() / crest.sum())
+        
+        # Bordes absorbentes: capa esponja que amortigua las velocidades
+        self.sponge = np.ones((self.rows, self.cols))
+        if border == "absorbing":
+            layer = max(1, min(self.rows, self.cols) // 8)
+            ramp = np.ones(max(self.rows, self.cols))
+            ramp[:layer] = np.linspace(0.8, 1.0, layer, endpoint=False)
+            row_ramp = np.minimum(ramp[:self.rows], ramp[:self.rows][::-1])
+            col_ramp = np.minimum(ramp[:self.cols], ramp[:self.cols][::-1])
+            # Se aplica una vez por subpaso
+            self.sponge = np.minimum(row_ramp[:, np.newaxis], col_ramp[np.newaxis, :]) ** (1 / substeps)
     
     def add_wave(self, x, y):
         """Agrega una nueva onda en las coordenadas dadas"""
         grid_x = int(x / self.resolution)
         grid_y = int(y / self.resolution)
         
-        if 0 <= grid_x < self.cols and 0 <= grid_y < self.rows:
+        if not (0 <= grid_x < self.cols and 0 <= grid_y < self.rows):
+            return
+        
+        if self.solver == "wave":
+            self.add_drop(grid_x, grid_y)
+        else:
             self.waves.append(WavePoint(grid_x, grid_y))
     
+    def add_drop(self, grid_x, grid_y):
+        """Suma el perfil de una gota al campo de alturas (modo "wave")"""
+        r = 2 * self.drop_radius
+        row0, row1 = max(0, grid_y - r), min(self.rows, grid_y + r + 1)
+        col0, col1 = max(0, grid_x - r), min(self.cols, grid_x + r + 1)
+        shape = self.drop_shape[
+            row0 - (grid_y - r):row1 - (grid_y - r),
+            col0 - (grid_x - r):col1 - (grid_x - r),
+        ]
+        self.heights[row0:row1, col0:col1] += shape
+        # Cerca del borde el perfil se recorta y deja de sumar cero: el
+        # volumen sobrante se reparte en todo el campo
+        self.heights -= shape.sum() / self.heights.size
+    
+    def get_ring_cells(self, wave):
+        """Celdas del anillo de una onda: (filas, columnas, distancias)
+        
+        Por cada fila del recuadro del anillo se recorren sólo los dos tramos
+        de columnas entre el radio interior y el exterior, así el costo es
+        proporcional al perímetro y no al área de la cuadrícula.
+        """
+        position, half_width = wave.get_ring()
+        inner, outer = position - half_width, position + half_width
+        row0 = max(0, wave.y - math.floor(outer))
+        row1 = min(self.rows - 1, wave.y + math.floor(outer))
+        if row0 > row1:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        
+        rows = np.arange(row0, row1 + 1)
+        dy2 = (rows - wave.y) ** 2
+        # Márgenes de una celda; la máscara exacta se aplica después
+        dx_out = np.floor(np.sqrt(np.maximum(outer ** 2 - dy2, 0))).astype(np.int64) + 1
+        hole = np.maximum(inner, 0) ** 2 - dy2
+        dx_in = np.where(hole > 0, np.floor(np.sqrt(np.maximum(hole, 0))).astype(np.int64) - 1, 0)
+        dx_in = np.maximum(dx_in, 0)
+        
+        # Tramo derecho [x + dx_in, x + dx_out] e izquierdo [x - dx_out, x - max(dx_in, 1)]
+        starts = np.concatenate([wave.x + dx_in, wave.x - dx_out])
+        stops = np.concatenate([wave.x + dx_out, wave.x - np.maximum(dx_in, 1)])
+        starts = np.maximum(starts, 0)
+        stops = np.minimum(stops, self.cols - 1)
+        lengths = np.maximum(stops - starts + 1, 0)
+        
+        segment_rows = np.concatenate([rows, rows])
+        total = int(lengths.sum())
+        first = np.cumsum(lengths) - lengths
+        cell_rows = np.repeat(segment_rows, lengths)
+        cell_cols = np.repeat(starts - first, lengths) + np.arange(total)
+        
+        distance = np.sqrt((cell_cols - wave.x) ** 2 + (cell_rows - wave.y) ** 2)
+        ring = np.abs(distance - position) < half_width
+        return cell_rows[ring], cell_cols[ring], distance[ring]
+    
+    def clear(self):
+        """Elimina las ondas y deja el agua en reposo"""
+        self.waves.clear()
+        self.heights.fill(0.0)
+        self.velocities.fill(0.0)
+    
+    def compute_laplacian(self, r0, r1):
+        """Laplaciano con estencil de 5 puntos para las filas [r0, r1)"""
+        padded = self.padded_heights
+        lap = self.laplacian[r0:r1]
+        scratch = self.scratch[r0:r1]
+        np.add(padded[r0:r1, 1:-1], padded[r0 + 2:r1 + 2, 1:-1], out=lap)
+        lap += padded[r0 + 1:r1 + 1, :-2]
+        lap += padded[r0 + 1:r1 + 1, 2:]
+        np.multiply(self.heights[r0:r1], 4, out=scratch)
+        lap -= scratch
+    
+    def integrate(self, r0, r1, dt):
+        """Euler simpléctico para las filas [r0, r1): velocidades y luego alturas"""
+        lap = self.laplacian[r0:r1]
+        velocities = self.velocities[r0:r1]
+        scratch = self.scratch[r0:r1]
+        lap *= self.spread * dt
+        velocities += lap
+        velocities *= self.damping ** dt
+        if self.border == "absorbing":
+            velocities *= self.sponge[r0:r1]
+        np.multiply(velocities, dt, out=scratch)
+        self.heights[r0:r1] += scratch
+        if self.border == "absorbing":
+            # La esponja también lleva las alturas al nivel de reposo; si sólo
+            # frenara velocidades el volumen podría quedar atrapado en el borde
+            self.heights[r0:r1] *= self.sponge[r0:r1]
+    
+    def step_wave_equation(self, dt):
+        """Un paso de la ecuación de onda, en el lugar sobre los buffers"""
+        padded = self.padded_heights
+        # Celdas fantasma: copiar el borde equivale a derivada normal nula
+        padded[0, :] = padded[1, :]
+        padded[-1, :] = padded[-2, :]
+        padded[:, 0] = padded[:, 1]
+        padded[:, -1] = padded[:, -2]
+        
+        if len(self.stripes) < 2:
+            self.compute_laplacian(0, self.rows)
+            self.integrate(0, self.rows, dt)
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(len(self.stripes))
+        
+        # Las franjas leen filas de halo de sus vecinas, así que todas terminan
+        # el laplaciano (barrera) antes de que alguna modifique sus alturas.
+        # NumPy libera el GIL en estas operaciones sobre arreglos grandes.
+        list(self.executor.map(lambda stripe: self.compute_laplacian(*stripe), self.stripes))
+        list(self.executor.map(lambda stripe: self.integrate(*stripe, dt), self.stripes))
+    
+    def close(self):
+        """Libera los hilos del paso en paralelo, si se llegaron a crear"""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+    
     def update(self):
         """Actualiza la simulación de agua"""
+        if self.solver == "wave":
+            # Subpasos: estable mientras spread * dt^2 <= 0.5
+            dt = 1 / self.substeps
+            for _ in range(self.substeps):
+                self.step_wave_equation(dt)
+            return
+        
         # Actualizar ondas y remover las que terminaron
         self.waves = [wave for wave in self.waves if wave.update()]
         
-        # Aplicar influencia de las ondas
-        for row in range(self.rows):
-            for col in range(self.cols):
-                total_influence = 0
-                for wave in self.waves:
-                    total_influence += wave.get_influence(col, row)
-                
-                self.heights[row][col] = total_influence
+        # Aplicar influencia de cada onda sólo sobre las celdas de su anillo
+        self.heights.fill(0.0)
+        for wave in self.waves:
+            rows, cols, distance = self.get_ring_cells(wave)
+            self.heights[rows, cols] += wave.get_influence_grid(distance)
+    
+    def set_palette(self, palette, scale=5):
+        """Cambia la paleta RGB (N, 3); la altura h usa el índice int(|h| * scale)"""
+        self.palette_rgb = np.asarray(palette, dtype=np.uint8)
+        self.palette_hex = np.array([f"#{r:02x}{g:02x}{b:02x}" for r, g, b in self.palette_rgb], dtype=object)
+        self.palette_scale = scale
+    
+    def color_index(self, heights):
+        """Índice de la paleta para una altura o una matriz de alturas"""
+        index = (np.abs(heights) * self.palette_scale).astype(np.int64)
+        return np.minimum(index, len(self.palette_rgb) - 1)
     
     def get_color(self, height):
         """Obtiene el color basado en la altura del agua"""
-        # Agua más oscura en reposo, más clara en crestas
-        base_blue = 100
-        intensity = int(abs(height) * 5)
-        blue = min(255, base_blue + intensity)
-        green = min(180, 50 + intensity)
-        
-        return f"#{0:02x}{green:02x}{blue:02x}"
+        return self.palette_hex[min(int(abs(height) * self.palette_scale), len(self.palette_hex) - 1)]
+    
+    def get_rgb_image(self):
+        """Obtiene la cuadrícula como imagen RGB usando la paleta"""
+        return self.palette_rgb[self.color_index(self.heights)]
     
     def get_grid_data(self):
         """Obtiene los datos de la cuadrícula para visualización"""
+        colors = self.palette_hex[self.color_index(self.heights)]
         data = []
         for row in range(self.rows):
             for col in range(self.cols):
-                height = self.heights[row][col]
                 x = col * self.resolution
                 y = row * self.resolution
-                color = self.get_color(height)
-                data.append((x, y, color, height))
+                data.append((x, y, colors[row, col], self.heights[row, col]))
         return data
 
 
 class WaterSimulatorVisualizer:
-    """Controla la visualización y UI del simulador de agua"""
+    """Controla la visualización y UI del simulador de agua
+    
+    render_mode="containers": un ft.Container por celda.
+    render_mode="image": toda la cuadrícula en un único ft.Image PNG que se
+    reemplaza en cada cuadro; permite resolution=1.
+    """
     
-    def __init__(self, page: ft.Page):
+    def __init__(self, page: ft.Page, render_mode="containers", resolution=15,
+                 change_threshold=0.1, canvas_size=500, solver="rings", substeps=1,
+                 threads=1):
         self.page = page
-        self.canvas_size = 500
+        self.canvas_size = canvas_size
+        self.render_mode = render_mode
         
-        self.water_grid = WaterGrid(self.canvas_size, self.canvas_size)
+        self.water_grid = WaterGrid(self.canvas_size, self.canvas_size, resolution,
+                                    solver=solver, substeps=substeps, threads=threads)
+        
+        # Alturas con las que se dibujó cada celda por última vez (NaN = nunca)
+        self.change_threshold = change_threshold
+        self.drawn_heights = np.full((self.water_grid.rows, self.water_grid.cols), np.nan)
         self.is_playing = True
         self.auto_waves = False
         
+        # Simulación a paso fijo, independiente del ritmo de dibujo
+        self.sim_dt = 0.05
+        self.max_sim_steps = 5
+        self.render_interval = 1 / 30
+        self.sim_steps = 0
+        self.rendered_step = -1
+        self.render_count = 0
+        
         self.setup_ui()
     
     def setup_ui(self):
         """Configura la interfaz de usuario"""
         # Contenedores para los puntos de agua
         self.water_points = []
-        for row in range(self.water_grid.rows):
-            for col in range(self.water_grid.cols):
-                point = ft.Container(
-                    width=self.water_grid.resolution,
-                    height=self.water_grid.resolution,
-                    bgcolor="#003366",
-                    left=col * self.water_grid.resolution,
-                    top=row * self.water_grid.resolution,
-                )
-                self.water_points.append(point)
+        self.water_image = None
+        if self.render_mode == "image":
+            # Una sola imagen con un píxel por celda, escalada al canvas
+            self.water_image = ft.Image(
+                src_base64=self.encode_frame(),
+                width=self.canvas_size,
+                height=self.canvas_size,
+                fit=ft.ImageFit.FILL,
+                filter_quality=ft.FilterQuality.NONE,
+                gapless_playback=True,
+            )
+        else:
+            for row in range(self.water_grid.rows):
+                for col in range(self.water_grid.cols):
+                    point = ft.Container(
+                        width=self.water_grid.resolution,
+                        height=self.water_grid.resolution,
+                        bgcolor="#003366",
+                        left=col * self.water_grid.resolution,
+                        top=row * self.water_grid.resolution,
+                    )
+                    self.water_points.append(point)
         
         # Canvas principal con gesture detector
         self.canvas = ft.Stack(
-            self.water_points,
+            [self.water_image] if self.water_image is not None else self.water_points,
             width=self.canvas_size,
             height=self.canvas_size,
         )
@@ -145,6 +423,8 @@ class WaterSimulatorVisualizer:
             on_tap_down=self.on_canvas_tap,
         )
         
+        self.stats_text = ft.Text("", size=12, color=ft.Colors.WHITE70)
+        
         # Controles
         self.play_btn = ft.IconButton(
             icon=ft.Icons.PAUSE,
@@ -160,6 +440,7 @@ class WaterSimulatorVisualizer:
                        size=32, 
                        weight=ft.FontWeight.BOLD, 
                        color=ft.Colors.WHITE),
+                self.stats_text,
                 ft.Container(
                     content=self.gesture_detector,
                     bgcolor="#001a33",
@@ -176,6 +457,13 @@ class WaterSimulatorVisualizer:
                         on_click=self.create_random_wave,
                         tooltip="Onda Aleatoria"
                     ),
+                    ft.IconButton(
+                        icon=ft.Icons.WAVES,
+                        icon_color=ft.Colors.BLUE_200,
+                        icon_size=30,
+                        on_click=self.toggle_solver,
+                        tooltip="Anillos / Ecuación de onda"
+                    ),
                     ft.IconButton(
                         icon=ft.Icons.CLEAR_ALL,
                         icon_color=ft.Colors.ORANGE_400,
@@ -211,18 +499,44 @@ class WaterSimulatorVisualizer:
         """Maneja el clic en el canvas"""
         self.water_grid.add_wave(e.local_x, e.local_y)
     
+    def encode_frame(self):
+        """Codifica el estado actual del agua como PNG en base64"""
+        png = encode_png(self.water_grid.get_rgb_image())
+        return base64.b64encode(png).decode("ascii")
+    
     def update_visualization(self):
         """Actualiza la visualización del agua"""
-        grid_data = self.water_grid.get_grid_data()
+        # Sólo las celdas que cambiaron más que el umbral desde que se dibujaron
+        heights = self.water_grid.heights
+        changed = ~(np.abs(heights - self.drawn_heights) <= self.change_threshold)
+        if not changed.any():
+            return
+        self.drawn_heights[changed] = heights[changed]
+        
+        if self.water_image is not None:
+            # Un único envío por cuadro en lugar de una actualización por celda
+            self.water_image.src_base64 = self.encode_frame()
+            self.water_image.update()
+            return
         
-        for i, (x, y, color, height) in enumerate(grid_data):
-            if i < len(self.water_points):
-                self.water_points[i].bgcolor = color
-                # Efecto 3D: elevar puntos con mayor altura
-                offset = max(-5, min(5, height * 0.2))
-                self.water_points[i].scale = 1.0 + abs(offset * 0.02)
+        rows, cols = np.nonzero(changed)
+        colors = self.water_grid.palette_hex[self.water_grid.color_index(heights[rows, cols])]
+        dirty_points = []
+        for row, col, color in zip(rows, cols, colors):
+            height = heights[row, col]
+            point = self.water_points[row * self.water_grid.cols + col]
+            point.bgcolor = color
+            # Efecto 3D: elevar puntos con mayor altura
+            offset = max(-5, min(5, height * 0.2))
+            point.scale = 1.0 + abs(offset * 0.02)
+            dirty_points.append(point)
         
-        self.canvas.update()
+        self.page.update(*dirty_points)
+    
+    def set_palette(self, palette, scale=5):
+        """Cambia la paleta en caliente y fuerza a redibujar todas las celdas"""
+        self.water_grid.set_palette(palette, scale)
+        self.drawn_heights.fill(np.nan)
     
     def toggle_play(self, e):
         """Alterna entre play y pause"""
@@ -233,48 +547,198 @@ class WaterSimulatorVisualizer:
     
     def create_random_wave(self, e):
         """Crea una onda en posición aleatoria"""
-        import random
         x = random.uniform(50, self.canvas_size - 50)
         y = random.uniform(50, self.canvas_size - 50)
         self.water_grid.add_wave(x, y)
     
     def clear_waves(self, e):
         """Limpia todas las ondas"""
-        self.water_grid.waves.clear()
+        self.water_grid.clear()
+    
+    def toggle_solver(self, e):
+        """Alterna entre anillos analíticos y la ecuación de onda"""
+        self.water_grid.solver = "wave" if self.water_grid.solver == "rings" else "rings"
+        self.water_grid.clear()
     
     def toggle_auto_waves(self, e):
         """Activa/desactiva ondas automáticas"""
         self.auto_waves = not self.auto_waves
     
-    async def animate(self):
-        """Loop principal de animación"""
-        import random
-        frame_count = 0
+    def simulation_step(self):
+        """Avanza la física un paso fijo de sim_dt"""
+        self.water_grid.update()
+        
+        # Generar ondas automáticas
+        if self.auto_waves and self.sim_steps % 30 == 0:
+            x = random.uniform(100, self.canvas_size - 100)
+            y = random.uniform(100, self.canvas_size - 100)
+            self.water_grid.add_wave(x, y)
+        
+        self.sim_steps += 1
+    
+    async def simulate(self):
+        """Loop de física con acumulador: siempre pasos de sim_dt"""
+        previous = time.perf_counter()
+        accumulator = 0.0
         
         while True:
-            await asyncio.sleep(0.05)
-            if self.is_playing:
-                self.water_grid.update()
+            now = time.perf_counter()
+            accumulator += now - previous
+            previous = now
+            
+            steps = 0
+            while accumulator >= self.sim_dt and steps < self.max_sim_steps:
+                if self.is_playing:
+                    self.simulation_step()
+                accumulator -= self.sim_dt
+                steps += 1
+            # Si el retraso es excesivo se descarta en lugar de acumularlo
+            if steps == self.max_sim_steps:
+                accumulator = min(accumulator, self.sim_dt)
+            
+            await asyncio.sleep(self.sim_dt - accumulator)
+    
+    async def render(self):
+        """Loop de dibujo: muestra el último estado y descarta los intermedios"""
+        stats_start = time.perf_counter()
+        stats_steps = self.sim_steps
+        stats_frames = self.render_count
+        
+        while True:
+            start = time.perf_counter()
+            if self.rendered_step != self.sim_steps:
+                self.rendered_step = self.sim_steps
                 self.update_visualization()
-                
-                # Generar ondas automáticas
-                if self.auto_waves and frame_count % 30 == 0:
-                    x = random.uniform(100, self.canvas_size - 100)
-                    y = random.uniform(100, self.canvas_size - 100)
-                    self.water_grid.add_wave(x, y)
-                
-                frame_count += 1
+                self.render_count += 1
+            
+            elapsed = start - stats_start
+            if elapsed >= 1:
+                sim_hz = (self.sim_steps - stats_steps) / elapsed
+                fps = (self.render_count - stats_frames) / elapsed
+                self.stats_text.value = f"Física: {sim_hz:.0f} Hz · Render: {fps:.0f} FPS"
+                self.stats_text.update()
+                stats_start, stats_steps, stats_frames = start, self.sim_steps, self.render_count
+            
+            await asyncio.sleep(max(0, self.render_interval - (time.perf_counter() - start)))
+    
+    async def animate(self):
+        """Loop principal de animación"""
+        await asyncio.gather(self.simulate(), self.render())
 
+def simulate_frames(grid, steps, drops=()):
+    """Genera las alturas de cada paso sin interfaz
+    
+    drops: secuencia de (paso, x, y) en coordenadas de píxel.
+    El arreglo entregado es el estado interno de la cuadrícula y se
+    sobrescribe en el siguiente paso; copiarlo si se quiere conservar.
+    """
+    pending = sorted(drops)
+    for step in range(steps):
+        while pending and pending[0][0] <= step:
+            _, x, y = pending.pop(0)
+            grid.add_wave(x, y)
+        grid.update()
+        yield grid.heights
 
-def main(page: ft.Page):
-    """Función principal"""
+
+def export_frames(grid, frames, output, steps):
+    """Escribe los cuadros a medida que se generan
+    
+    output terminado en .npy: arreglo apilado (pasos, filas, columnas) en
+    float32 mapeado en disco. Si no, un directorio de PNG numerados.
+    """
+    if output.endswith(".npy"):
+        stack = np.lib.format.open_memmap(
+            output, mode="w+", dtype=np.float32, shape=(steps, grid.rows, grid.cols)
+        )
+        for i, heights in enumerate(frames):
+            stack[i] = heights
+        stack.flush()
+        return
+    
+    os.makedirs(output, exist_ok=True)
+    for i, heights in enumerate(frames):
+        rgb = grid.palette_rgb[grid.color_index(heights)]
+        with open(os.path.join(output, f"frame_{i:05d}.png"), "wb") as f:
+            f.write(encode_png(rgb))
+
+
+def run_headless(args):
+    """Simulación por lotes desde la línea de comandos"""
+    grid = WaterGrid(args.size, args.size, args.resolution, solver=args.solver,
+                     substeps=args.substeps, threads=args.threads)
+    drops = [tuple(drop) for drop in args.drop] or [(0, args.size / 2, args.size / 2)]
+    start = time.perf_counter()
+    try:
+        export_frames(grid, simulate_frames(grid, args.headless, drops), args.output, args.headless)
+    finally:
+        grid.close()
+    elapsed = time.perf_counter() - start
+    print(f"{args.headless} pasos de {grid.rows}x{grid.cols} en {elapsed:.2f} s "
+          f"({args.headless / elapsed:.1f} pasos/s) -> {args.output}")
+
+
+def benchmark_threads(size, steps, thread_counts):
+    """Pasos por segundo de la ecuación de onda según el número de hilos"""
+    base = None
+    for threads in thread_counts:
+        grid = WaterGrid(size, size, 1, solver="wave", threads=threads)
+        try:
+            grid.add_wave(size / 2, size / 2)
+            grid.update()
+            start = time.perf_counter()
+            for _ in range(steps):
+                grid.update()
+            rate = steps / (time.perf_counter() - start)
+        finally:
+            grid.close()
+        base = base or rate
+        print(f"{threads:3d} hilos: {rate:8.2f} pasos/s  (x{rate / base:.2f})")
+
+
+def main(page: ft.Page, **options):
+    """Función principal; `options` se pasan a WaterSimulatorVisualizer"""
     page.title = "Ondas de Agua"
     page.theme_mode = ft.ThemeMode.DARK
     page.bgcolor = "#0a0e27"
     page.padding = 20
     
-    visualizer = WaterSimulatorVisualizer(page)
+    visualizer = WaterSimulatorVisualizer(page, **options)
     page.run_task(visualizer.animate)
 
 
-ft.app(target=main)
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulador de ondas de agua")
+    parser.add_argument("--headless", type=int, metavar="PASOS",
+                        help="Simular sin interfaz y exportar los cuadros")
+    parser.add_argument("--output", default="frames", help="Directorio de PNG o archivo .npy")
+    parser.add_argument("--size", type=int, default=500)
+    parser.add_argument("--resolution", type=int, default=15,
+                        help="Píxeles por celda (con --render image se puede usar 1)")
+    parser.add_argument("--render", choices=["containers", "image"], default="containers",
+                        help="Un ft.Container por celda o una sola imagen PNG")
+    parser.add_argument("--solver", choices=["rings", "wave"], default="rings")
+    parser.add_argument("--substeps", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=1,
+                        help="Hilos para el paso de la ecuación de onda")
+    parser.add_argument("--bench-threads", action="store_true",
+                        help="Medir la escalabilidad por hilos (resolución 1, --size celdas)")
+    parser.add_argument("--drop", nargs=3, type=float, action="append", default=[],
+                        metavar=("PASO", "X", "Y"), help="Gota programada (repetible)")
+    args = parser.parse_args()
+    
+    if args.bench_threads:
+        counts = sorted({1, 2, 4, os.cpu_count() or 1, args.threads})
+        benchmark_threads(args.size, args.headless or 50, counts)
+    elif args.headless:
+        run_headless(args)
+    else:
+        if args.drop:
+            parser.error("--drop sólo se usa con --headless")
+        if ft is None:
+            parser.error("Flet no está instalado; usar --headless o --bench-threads")
+        ft.app(target=functools.partial(
+            main, render_mode=args.render, canvas_size=args.size,
+            resolution=args.resolution, solver=args.solver,
+            substeps=args.substeps, threads=args.threads,
+        ))
\ No newline at end of file